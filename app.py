@@ -2,11 +2,12 @@
 Streamlit Web Interface for Voice Clone PDF Reader
 """
 
+import io
 import streamlit as st
 import logging
 import os
 import tempfile
-from voice_clone_pdf_reader import PDFReader, VoiceCloneTTS, SileroTTSEngine, TTSEngine
+from voice_clone_pdf_reader import VoiceCloneTTS, SileroTTSEngine, TTSEngine, SynthesisPipeline, ExtractionError
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -120,73 +121,72 @@ with col1:
             if st.button(button_text, type="primary"):
                 with st.spinner("Processing PDF..."):
                     try:
-                        # Read PDF
-                        reader = PDFReader(pdf_path)
-                        text = reader.extract_text()
+                        # Convert to speech using selected TTS engine
+                        spinner_text = "🎤 Generating speech..."
+                        if tts_engine == "Coqui XTTS (Voice Cloning)":
+                            spinner_text = "🎤 Generating speech with your voice... This may take a few minutes"
+                        elif tts_engine == "Silero TTS (Best Quality)":
+                            spinner_text = "⚡ Generating high-quality speech..."
                         
-                        if not text:
-                            st.error("❌ No text extracted from PDF")
-                            st.info("Make sure the PDF contains readable text (not scanned images)")
-                        else:
+                        with st.spinner(spinner_text):
+                            output_dir = "outputs"
+                            os.makedirs(output_dir, exist_ok=True)
+                            output_file = os.path.join(
+                                output_dir, 
+                                f"{uploaded_file.name.replace('.pdf', '')}_{language}.wav"
+                            )
+                            
+                            # Select TTS engine based on user choice
+                            if tts_engine == "Coqui XTTS (Voice Cloning)":
+                                tts = VoiceCloneTTS(
+                                    language=language,
+                                    voice_sample=voice_sample
+                                )
+                            elif tts_engine == "Silero TTS (Best Quality)":
+                                tts = SileroTTSEngine(language=language)
+                            else:  # Basic TTS
+                                tts = TTSEngine(language=language)
+                            
+                            # Extraction, chunking and synthesis overlap; the WAV is
+                            # assembled in memory for saving, playback and download
+                            pipeline = SynthesisPipeline(tts)
+                            buffer = io.BytesIO()
+                            try:
+                                pipeline.run(pdf_path, buffer)
+                                wav_bytes = buffer.getvalue()
+                            except ExtractionError as e:
+                                wav_bytes = None
+                                st.error(f"❌ {e}")
+                                st.info("Make sure the PDF contains readable text (not scanned images)")
+                        
+                        if wav_bytes:
+                            text = "\n".join(pipeline.pages).strip()
                             st.success(f"✅ Extracted {len(text)} characters from PDF")
                             
                             # Show a preview of the text
                             with st.expander("📄 Preview Extracted Text"):
                                 st.text(text[:500] + "..." if len(text) > 500 else text)
                             
-                            # Convert to speech using selected TTS engine
-                            spinner_text = "🎤 Generating speech..."
-                            if tts_engine == "Coqui XTTS (Voice Cloning)":
-                                spinner_text = "🎤 Generating speech with your voice... This may take a few minutes"
-                            elif tts_engine == "Silero TTS (Best Quality)":
-                                spinner_text = "⚡ Generating high-quality speech..."
+                            with open(output_file, "wb") as f:
+                                f.write(wav_bytes)
                             
-                            with st.spinner(spinner_text):
-                                output_dir = "outputs"
-                                os.makedirs(output_dir, exist_ok=True)
-                                output_file = os.path.join(
-                                    output_dir, 
-                                    f"{uploaded_file.name.replace('.pdf', '')}_{language}.wav"
-                                )
-                                
-                                # Select TTS engine based on user choice
-                                if tts_engine == "Coqui XTTS (Voice Cloning)":
-                                    if not voice_sample:
-                                        st.error("❌ Voice sample required for voice cloning")
-                                    else:
-                                        tts = VoiceCloneTTS(
-                                            language=language,
-                                            voice_sample=voice_sample
-                                        )
-                                        audio_path = tts.speak(text, output_file=output_file)
-                                        
-                                elif tts_engine == "Silero TTS (Best Quality)":
-                                    tts = SileroTTSEngine(language=language)
-                                    audio_path = tts.speak(text, output_file=output_file)
-                                    
-                                else:  # Basic TTS
-                                    tts = TTSEngine(language=language)
-                                    audio_path = tts.speak(text, output_file=output_file)
+                            st.success("🎉 Audio generated successfully!")
+                            
+                            # Display audio player
+                            with col2:
+                                st.header("🔊 Generated Audio")
+                                st.audio(wav_bytes, format="audio/wav")
                                 
-                                st.success("🎉 Audio generated successfully!")
+                                # Show file info
+                                st.info(f"📊 File size: {len(wav_bytes) / 1024:.2f} KB")
                                 
-                                # Display audio player
-                                with col2:
-                                    st.header("🔊 Generated Audio")
-                                    st.audio(output_file, format="audio/wav")
-                                    
-                                    # Show file info
-                                    file_size = os.path.getsize(output_file)
-                                    st.info(f"📊 File size: {file_size / 1024:.2f} KB")
-                                    
-                                    # Download button
-                                    with open(output_file, "rb") as f:
-                                        st.download_button(
-                                            label="📥 Download Audio",
-                                            data=f.read(),
-                                            file_name=os.path.basename(output_file),
-                                            mime="audio/wav"
-                                        )
+                                # Download button
+                                st.download_button(
+                                    label="📥 Download Audio",
+                                    data=wav_bytes,
+                                    file_name=os.path.basename(output_file),
+                                    mime="audio/wav"
+                                )
                     
                     except Exception as e:
                         st.error(f"❌ Error: {str(e)}")
@@ -0,0 +1,135 @@
+"""
+Memory benchmark - per-worker RSS with private vs shared (memory-mapped) model weights
+"""
+
+import argparse
+import logging
+import multiprocessing as mp
+import os
+import queue
+import tempfile
+import time
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def read_memory() -> dict:
+    """Read RSS, PSS and private (USS) memory of this process in MB from /proc."""
+    memory = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            fields = line.split()
+            if fields[0] in ("Rss:", "Pss:", "Private_Clean:", "Private_Dirty:"):
+                memory[fields[0].rstrip(":")] = int(fields[1]) / 1024
+    return {
+        "rss": memory["Rss"],
+        "pss": memory["Pss"],
+        "uss": memory["Private_Clean"] + memory["Private_Dirty"],
+    }
+
+
+def worker(language, shared_weights, voice_sample, ready, done, results, timeout):
+    """Load an engine, synthesize once, report memory and wait for the others."""
+    try:
+        from voice_clone_pdf_reader import VoiceCloneTTS
+        
+        tts = VoiceCloneTTS(language=language, voice_sample=voice_sample,
+                            device="cpu", shared_weights=shared_weights)
+        if voice_sample:
+            tts.synthesize("This is a short memory benchmark sentence.")
+        ready.wait(timeout)
+        # PSS is only meaningful once every worker has mapped the weights
+        results.put((os.getpid(), read_memory()))
+    except Exception as e:
+        # Break the barrier so the other workers don't wait for this one
+        ready.abort()
+        results.put((os.getpid(), e))
+        raise
+    done.wait(timeout)
+
+
+def run(workers: int, language: str, shared_weights, voice_sample=None, timeout: float = 1800):
+    """
+    Run one benchmark round and return per-worker memory readings.
+    
+    Raises:
+        RuntimeError: If a worker fails, exits early or does not report in time
+    """
+    ctx = mp.get_context("spawn")
+    ready = ctx.Barrier(workers)
+    done = ctx.Event()
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=worker, args=(language, shared_weights, voice_sample, ready, done, results, timeout))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    
+    readings = []
+    deadline = time.monotonic() + timeout
+    try:
+        while len(readings) < workers:
+            try:
+                pid, reading = results.get(timeout=5)
+            except queue.Empty:
+                crashed = [p for p in processes if p.exitcode not in (None, 0)]
+                if crashed:
+                    raise RuntimeError(f"Worker {crashed[0].pid} exited with code {crashed[0].exitcode}")
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Workers did not report within {timeout:.0f}s")
+                continue
+            if isinstance(reading, Exception):
+                raise RuntimeError(f"Worker {pid} failed: {reading}")
+            readings.append((pid, reading))
+    finally:
+        done.set()
+        for process in processes:
+            process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+    return readings
+
+
+def report(title: str, readings):
+    """Log a table of per-worker memory."""
+    logger.info(title)
+    logger.info(f"{'pid':>8} {'RSS MB':>10} {'PSS MB':>10} {'USS MB':>10}")
+    for pid, memory in readings:
+        logger.info(f"{pid:>8} {memory['rss']:>10.0f} {memory['pss']:>10.0f} {memory['uss']:>10.0f}")
+    total_pss = sum(memory["pss"] for _, memory in readings)
+    logger.info(f"Total PSS across {len(readings)} workers: {total_pss:.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-worker memory with private vs shared weights")
+    parser.add_argument("--workers", "-n", type=int, default=4, help="Worker processes (default: 4)")
+    parser.add_argument("--language", "-l", default="english", help="Language (default: english)")
+    parser.add_argument("--shared-weights", help="Shared weights file (default: a temporary file)")
+    parser.add_argument("--voice-sample", "-v",
+                        help="Reference voice; if given, each worker also synthesizes a sentence")
+    parser.add_argument("--timeout", type=float, default=1800,
+                        help="Seconds to wait for workers to load (default: 1800)")
+    args = parser.parse_args()
+    
+    shared_weights = args.shared_weights or os.path.join(tempfile.gettempdir(), "xtts_shared_weights.pt")
+    
+    # Export once up front so the timed round doesn't include the conversion
+    if not os.path.exists(shared_weights):
+        logger.info("Exporting shared weights...")
+        start = time.perf_counter()
+        run(1, args.language, shared_weights, args.voice_sample, args.timeout)
+        logger.info(f"Export took {time.perf_counter() - start:.0f}s")
+    
+    private = run(args.workers, args.language, None, args.voice_sample, args.timeout)
+    report("Private weights (one copy per worker):", private)
+    shared = run(args.workers, args.language, shared_weights, args.voice_sample, args.timeout)
+    report("Shared memory-mapped weights:", shared)
+    logger.info("RSS counts shared pages in every worker; PSS splits them between workers "
+                "and USS shows what each additional worker really costs.")
+
+
+if __name__ == "__main__":
+    main()
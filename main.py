@@ -5,7 +5,7 @@ Main CLI Application for Voice Clone PDF Reader
 import argparse
 import logging
 import os
-from voice_clone_pdf_reader import PDFReader, TTSEngine, VoiceCloneTTS
+from voice_clone_pdf_reader import PDFReader, TTSEngine, VoiceCloneTTS, ChapterSynthesizer, IncrementalConverter, remove_manifest, SynthesisPipeline, ChunkTuner
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,36 +21,33 @@ def main():
                        help="Enable voice cloning")
     parser.add_argument("--voice-sample", "-v", 
                        help="Path to reference voice sample for cloning")
+    parser.add_argument("--split-chapters", action="store_true",
+                       help="Write one audio file per chapter plus an index (output is a directory)")
+    parser.add_argument("--pages-per-chapter", type=int, default=10,
+                       help="Pages per chapter when the PDF has no outline (default: 10)")
+    parser.add_argument("--workers", type=int, default=1,
+                       help="Chapters synthesized in parallel, each with its own model (default: 1)")
+    parser.add_argument("--shared-weights",
+                       help="Memory-mapped weights file shared by all workers (created if missing, CPU only)")
+    parser.add_argument("--auto-chunk", action="store_true",
+                       help="Tune chunk length from measured speed and memory, "
+                            "remembering the result for the next run")
+    parser.add_argument("--incremental", action="store_true",
+                       help="Reuse audio from a previous conversion to the same output, "
+                            "re-synthesizing only changed text")
     
     args = parser.parse_args()
     
+    # Chapters are synthesized whole, and incremental runs need a stable chunking
+    # to match earlier audio, so neither can take a tuned chunk length
+    if args.auto_chunk and (args.split_chapters or args.incremental):
+        parser.error("--auto-chunk cannot be combined with --split-chapters or --incremental")
+    
     # Validate input
     if not os.path.exists(args.input):
         logger.error(f"PDF file not found: {args.input}")
         return
     
-    # Read PDF
-    logger.info(f"Reading PDF: {args.input}")
-    reader = PDFReader(args.input)
-    text = reader.extract_text()
-    
-    if not text:
-        logger.error("No text extracted from PDF")
-        return
-    
-    logger.info(f"Extracted {len(text)} characters from PDF")
-    
-    # Determine output path
-    if args.output:
-        output_path = args.output
-    else:
-        base_name = os.path.splitext(os.path.basename(args.input))[0]
-        output_path = f"outputs/{base_name}_{args.language}.wav"
-        os.makedirs("outputs", exist_ok=True)
-    
-    # Convert to speech
-    logger.info(f"Converting to speech in {args.language}...")
-    
     if args.voice_clone:
         if not args.voice_sample:
             logger.error("Voice sample required for voice cloning")
@@ -59,12 +56,61 @@ def main():
         if not os.path.exists(args.voice_sample):
             logger.error(f"Voice sample not found: {args.voice_sample}")
             return
+    
+    def create_engine():
+        if args.voice_clone:
+            return VoiceCloneTTS(language=args.language, voice_sample=args.voice_sample,
+                                 shared_weights=args.shared_weights)
+        return TTSEngine(language=args.language, shared_weights=args.shared_weights)
+    
+    logger.info(f"Reading PDF: {args.input}")
+    base_name = os.path.splitext(os.path.basename(args.input))[0]
+    
+    if args.split_chapters:
+        reader = PDFReader(args.input)
+        chapters = reader.get_chapters(pages_per_chapter=args.pages_per_chapter)
+        if not chapters:
+            logger.error("No text extracted from PDF")
+            return
         
-        tts = VoiceCloneTTS(language=args.language, voice_sample=args.voice_sample)
-        audio_path = tts.speak(text, output_file=output_path)
+        output_dir = args.output or f"outputs/{base_name}_{args.language}"
+        logger.info(f"Converting {len(chapters)} chapters to speech in {args.language}...")
+        synthesizer = ChapterSynthesizer(create_engine, max_workers=args.workers)
+        entries = synthesizer.synthesize(chapters, output_dir, source=args.input)
+        if any("error" in entry for entry in entries):
+            logger.error(f"Some chapters failed; see {os.path.join(output_dir, 'index.json')}")
+            return
+        audio_path = output_dir
+    elif args.incremental:
+        output_path = args.output or f"outputs/{base_name}_{args.language}.wav"
+        logger.info(f"Incrementally converting to speech in {args.language}...")
+        try:
+            IncrementalConverter(create_engine()).convert(args.input, output_path)
+        except ValueError as e:
+            logger.error(str(e))
+            return
+        audio_path = output_path
     else:
-        tts = TTSEngine(language=args.language)
-        audio_path = tts.speak(text, output_file=output_path)
+        # Determine output path
+        if args.output:
+            output_path = args.output
+        else:
+            output_path = f"outputs/{base_name}_{args.language}.wav"
+            os.makedirs("outputs", exist_ok=True)
+        
+        # Extraction, chunking, synthesis and writing run concurrently
+        logger.info(f"Converting to speech in {args.language}...")
+        engine = create_engine()
+        tuner = ChunkTuner.for_engine(engine) if args.auto_chunk else None
+        pipeline = SynthesisPipeline(engine, tuner=tuner)
+        # This overwrites the output, so an earlier incremental manifest no longer applies
+        remove_manifest(output_path)
+        try:
+            pipeline.run(args.input, output_path)
+        except ValueError as e:
+            logger.error(str(e))
+            return
+        audio_path = output_path
     
     logger.info(f"✅ Audio generated successfully: {audio_path}")
 
@@ -0,0 +1,132 @@
+"""
+Tests for GoogleTTSEngine against a local stand-in for the batchexecute endpoint
+"""
+
+import json
+import time
+import base64
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from voice_clone_pdf_reader.tts_engine import GoogleTTSEngine
+
+
+class StandInServer:
+    """Answer each request with its chunk text as the 'audio', after optional failures."""
+    
+    def __init__(self, delay: float = 0.0, failures: int = 0, status: int = 503):
+        self.delay = delay
+        self.failures = failures
+        self.status = status
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_port}/batchexecute"
+    
+    def _handler(self):
+        stand_in = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+            
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"])).decode()
+                rpc = json.loads(urllib.parse.unquote(body[len("f.req="):].rstrip("&")))
+                text = json.loads(rpc[0][0][1])[0]
+                with stand_in._lock:
+                    stand_in.requests += 1
+                    failing = stand_in.requests <= stand_in.failures
+                    stand_in.in_flight += 1
+                    stand_in.max_in_flight = max(stand_in.max_in_flight, stand_in.in_flight)
+                try:
+                    time.sleep(stand_in.delay)
+                    if failing:
+                        self.send_response(stand_in.status)
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    audio = base64.b64encode(text.encode("utf-8")).decode("ascii")
+                    payload = f')]}}\'\n[["wrb.fr","{GoogleTTSEngine.GOOGLE_TTS_RPC}","[\\"{audio}\\"]",null]]'
+                    data = payload.encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                finally:
+                    with stand_in._lock:
+                        stand_in.in_flight -= 1
+        
+        return Handler
+    
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+    
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def make_engine(server: StandInServer, **kwargs) -> GoogleTTSEngine:
+    kwargs.setdefault("backoff", 0.01)
+    return GoogleTTSEngine("english", base_url=server.url, **kwargs)
+
+
+def test_chunks_are_joined_in_order():
+    sentences = [f"Sentence number {i} is here." for i in range(40)]
+    with StandInServer(delay=0.01) as server:
+        engine = make_engine(server, max_workers=8)
+        audio = engine.synthesize_mp3(" ".join(sentences))
+        engine.close()
+    
+    # Each chunk's 'audio' is its own text, so the joined result must read in order
+    assert audio.decode("utf-8").replace(".S", ". S") == " ".join(sentences)
+    assert server.requests > 8
+
+
+def test_in_flight_requests_are_limited():
+    with StandInServer(delay=0.05) as server:
+        engine = make_engine(server, max_workers=3)
+        engine.synthesize_mp3(" ".join(f"Sentence number {i} is here." for i in range(30)))
+        engine.close()
+    
+    assert 1 < server.max_in_flight <= 3
+
+
+def test_server_errors_are_retried():
+    with StandInServer(failures=2, status=503) as server:
+        engine = make_engine(server, max_workers=1, max_retries=3)
+        audio = engine.synthesize_mp3("Hello there.")
+        engine.close()
+    
+    assert audio == b"Hello there."
+    assert server.requests == 3
+
+
+def test_client_errors_are_not_retried():
+    with StandInServer(failures=1, status=400) as server:
+        engine = make_engine(server, max_workers=1, max_retries=3)
+        with pytest.raises(requests.HTTPError):
+            engine.synthesize_mp3("Hello there.")
+        engine.close()
+    
+    assert server.requests == 1
+
+
+def test_failed_chunk_cancels_the_rest():
+    with StandInServer(failures=10 ** 6, status=503) as server:
+        engine = make_engine(server, max_workers=2, max_retries=2, backoff=0.2)
+        with pytest.raises(requests.HTTPError):
+            engine.synthesize_mp3(" ".join(f"Sentence number {i} is here." for i in range(60)))
+        engine.close()
+    
+    # Only the first chunks in flight were tried; the queued ones were dropped
+    assert server.requests <= 2 * 3
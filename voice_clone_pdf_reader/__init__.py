@@ -2,9 +2,15 @@
 Voice Clone PDF Reader - A library for converting PDFs to speech with voice cloning
 """
 
-from .pdf_reader import PDFReader
-from .tts_engine import TTSEngine, VoiceCloneTTS, GoogleTTSEngine, SileroTTSEngine
+from .pdf_reader import PDFReader, Chapter
+from .tts_engine import TTSEngine, VoiceCloneTTS, GoogleTTSEngine, SileroTTSEngine, encode_wav
 from .voice_clone import VoiceCloner
+from .chapters import ChapterSynthesizer
+from .incremental import IncrementalConverter, remove_manifest
+from .pipeline import SynthesisPipeline, PipelineCancelled, ExtractionError
+from .autotune import ChunkTuner
 
 __version__ = "1.0.0"
-__all__ = ["PDFReader", "TTSEngine", "VoiceCloneTTS", "GoogleTTSEngine", "SileroTTSEngine", "VoiceCloner"]
+__all__ = ["PDFReader", "TTSEngine", "VoiceCloneTTS", "GoogleTTSEngine", "SileroTTSEngine", "VoiceCloner",
+           "Chapter", "ChapterSynthesizer", "IncrementalConverter", "remove_manifest", "encode_wav",
+           "SynthesisPipeline", "PipelineCancelled", "ExtractionError", "ChunkTuner"]
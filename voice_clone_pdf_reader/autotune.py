@@ -0,0 +1,379 @@
+"""
+Auto-tune Module - Pick the chunk length with the best measured synthesis throughput
+"""
+
+import os
+import json
+import time
+import logging
+import platform
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import torch
+
+from .text_chunker import split_text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "voice_clone_pdf_reader", "chunk_profile.json"
+)
+
+# Chunk lengths (characters) the tuner chooses between
+DEFAULT_CANDIDATES = [60, 100, 150, 200, 250, 300, 400]
+
+# Bump when the meaning of stored measurements changes; older profiles are ignored
+PROFILE_VERSION = 2
+
+
+def _current_rss_mb() -> Optional[float]:
+    """Resident memory of this process in MB, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _available_ram_mb() -> Optional[float]:
+    """Memory available to new allocations in MB, or None where /proc is unavailable."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+class _RssSampler:
+    """Track the peak resident memory of this process while a call runs."""
+    
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak_mb = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+    
+    def _sample(self):
+        rss = _current_rss_mb()
+        if rss is not None and (self.peak_mb is None or rss > self.peak_mb):
+            self.peak_mb = rss
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+    
+    def __enter__(self):
+        self._sample()
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+class ChunkTuner:
+    """
+    Learn the chunk length that maximizes characters per second for one
+    engine, language and device, within a memory budget.
+    
+    Every synthesized chunk is recorded in the bucket of the nearest candidate
+    length. A fresh profile starts from the caller's usual chunk length; once
+    a length is trusted the tuner uses the best one and periodically probes
+    its neighbours, so it climbs towards the fastest length and can follow
+    changes. The learned profile is saved to disk and reused by the next run.
+    """
+    
+    def __init__(
+        self,
+        engine_name: str,
+        language: str,
+        device: str = "cpu",
+        candidates: Optional[List[int]] = None,
+        memory_limit_mb: Optional[float] = None,
+        min_samples: int = 2,
+        explore_every: int = 20,
+        smoothing: float = 0.3,
+        profile_path: str = DEFAULT_PROFILE_PATH
+    ):
+        """
+        Initialize Chunk Tuner.
+        
+        Args:
+            engine_name: Engine identifier, e.g. the engine class name
+            language: Target language
+            device: Device the engine runs on ('cpu' or 'cuda')
+            candidates: Chunk lengths to choose between
+            memory_limit_mb: Skip lengths whose synthesis needed more extra
+                memory than this (defaults to 90% of free GPU memory on CUDA,
+                80% of available RAM on CPU)
+            min_samples: Observations needed before a candidate is trusted
+            explore_every: Probe a neighbour of the best length on every this many ``target`` calls
+            smoothing: Weight of the newest observation in the moving averages
+            profile_path: JSON file holding learned profiles
+        """
+        self.candidates = sorted(candidates or DEFAULT_CANDIDATES)
+        self.device = device
+        self._cuda = device == "cuda" and torch.cuda.is_available()
+        self.key = f"{engine_name}:{language}:{self._hardware(device)}"
+        if memory_limit_mb is None:
+            if self._cuda:
+                total = torch.cuda.get_device_properties(0).total_memory
+                memory_limit_mb = 0.9 * (total - torch.cuda.memory_allocated()) / 2 ** 20
+            else:
+                available = _available_ram_mb()
+                memory_limit_mb = 0.8 * available if available is not None else None
+        self.memory_limit_mb = memory_limit_mb
+        self.min_samples = max(1, min_samples)
+        self.explore_every = max(1, explore_every)
+        self.smoothing = smoothing
+        self.profile_path = profile_path
+        self.buckets: Dict[int, Dict] = {}
+        self._calls = 0
+        self._lock = threading.Lock()
+        self._load()
+    
+    @classmethod
+    def for_engine(cls, engine, **kwargs) -> "ChunkTuner":
+        """Create a tuner keyed on an engine's class, language and device."""
+        return cls(
+            type(engine).__name__,
+            getattr(engine, "language", "unknown"),
+            str(getattr(engine, "device", "cpu")),
+            **kwargs
+        )
+    
+    @staticmethod
+    def _hardware(device: str) -> str:
+        """Identify the node type so profiles from different hardware don't mix."""
+        if device == "cuda" and torch.cuda.is_available():
+            return f"cuda-{torch.cuda.get_device_name(0)}"
+        return f"cpu-{platform.machine()}-{os.cpu_count()}"
+    
+    def _bucket(self, chars: int) -> int:
+        """Nearest candidate length for a chunk of ``chars`` characters."""
+        return min(self.candidates, key=lambda candidate: abs(candidate - chars))
+    
+    def _fits(self, stats: Dict) -> bool:
+        """Whether a bucket stayed within the memory budget."""
+        peak = stats.get("peak_mb")
+        return self.memory_limit_mb is None or peak is None or peak <= self.memory_limit_mb
+    
+    def _best(self) -> Optional[int]:
+        """Candidate with the highest trusted throughput within the memory budget."""
+        trusted = [
+            (stats["cps"], candidate) for candidate, stats in self.buckets.items()
+            if stats["samples"] >= self.min_samples and self._fits(stats)
+        ]
+        return max(trusted)[1] if trusted else None
+    
+    def _start(self, default: Optional[int]) -> int:
+        """Length to use while none is trusted: ``default``, stepping down while over budget."""
+        seed = self._bucket(default) if default else self.candidates[len(self.candidates) // 2]
+        index = self.candidates.index(seed)
+        while index > 0 and not self._fits(self.buckets.get(self.candidates[index], {})):
+            index -= 1
+        return self.candidates[index]
+    
+    def target(self, default: Optional[int] = None) -> int:
+        """
+        Chunk length to use for the next chunk.
+        
+        Until some length has enough samples to be trusted, this is
+        ``default``, so a fresh profile costs no more than the fixed chunk
+        length would. After that it is the best length, except on every
+        ``explore_every``-th call, which probes a neighbour of it (untried
+        neighbours first).
+        
+        Args:
+            default: Chunk length to start from (defaults to the middle candidate)
+        
+        Returns:
+            Target maximum characters per chunk
+        """
+        with self._lock:
+            self._calls += 1
+            best = self._best()
+            if best is None:
+                return self._start(default)
+            if self._calls % self.explore_every:
+                return best
+            
+            index = self.candidates.index(best)
+            neighbours = [
+                candidate for candidate in self.candidates[max(0, index - 1):index + 2]
+                if candidate != best and self._fits(self.buckets.get(candidate, {}))
+            ]
+            if not neighbours:
+                return best
+            for candidate in neighbours:
+                if self.buckets.get(candidate, {}).get("samples", 0) < self.min_samples:
+                    return candidate
+            return neighbours[(self._calls // self.explore_every) % len(neighbours)]
+    
+    def record(self, chars: int, seconds: float, peak_mb: Optional[float] = None):
+        """
+        Record the cost of one synthesized chunk.
+        
+        Args:
+            chars: Characters in the chunk
+            seconds: Wall-clock synthesis time
+            peak_mb: Extra memory the synthesis needed at its peak in MB, if known
+        """
+        if chars <= 0 or seconds <= 0:
+            return
+        cps = chars / seconds
+        with self._lock:
+            stats = self.buckets.setdefault(self._bucket(chars), {"cps": cps, "peak_mb": peak_mb, "samples": 0})
+            if stats["samples"]:
+                stats["cps"] += self.smoothing * (cps - stats["cps"])
+            # CPU figures after the first are skewed by memory kept from earlier calls
+            if peak_mb is not None and (self._cuda or stats["peak_mb"] is None):
+                stats["peak_mb"] = max(stats["peak_mb"] or 0.0, peak_mb)
+            stats["samples"] += 1
+    
+    @contextmanager
+    def measure(self, chars: int):
+        """
+        Time and measure the memory of one synthesis call.
+        
+        Memory is the peak growth over the call: from the CUDA allocator's
+        high-water mark on GPU, and from resident set size sampled in a
+        background thread on CPU. Memory held before the call, such as model
+        weights, is not counted.
+        
+        The CPU figure is approximate. Resident memory also grows with
+        allocations made at the same time by other threads (such as the
+        pipeline's extraction and chunking stages), and memory freed by an
+        earlier call but kept by the allocator hides part of later growth.
+        Only the first CPU measurement per length is therefore kept;
+        ``calibrate`` takes it while nothing else is running.
+        
+        Args:
+            chars: Characters being synthesized
+        """
+        if self._cuda:
+            torch.cuda.reset_peak_memory_stats()
+            baseline = torch.cuda.memory_allocated()
+            start = time.perf_counter()
+            yield
+            seconds = time.perf_counter() - start
+            peak_mb = (torch.cuda.max_memory_allocated() - baseline) / 2 ** 20
+        else:
+            baseline = _current_rss_mb()
+            with _RssSampler() as sampler:
+                start = time.perf_counter()
+                yield
+                seconds = time.perf_counter() - start
+            peak_mb = None
+            if baseline is not None and sampler.peak_mb is not None:
+                peak_mb = max(0.0, sampler.peak_mb - baseline)
+        self.record(chars, seconds, peak_mb)
+    
+    def calibrate(self, engine, sample_text: str, rounds: int = 2):
+        """
+        Measure every candidate length with a short calibration pass.
+        
+        Run it while the engine is otherwise idle: on CPU its memory figures
+        replace those measured during earlier runs.
+        
+        Args:
+            engine: Engine with a ``synthesize`` method
+            sample_text: Representative text in the target language
+            rounds: Measurements per candidate
+        """
+        if not self._cuda:
+            with self._lock:
+                for stats in self.buckets.values():
+                    stats["peak_mb"] = None
+        
+        for candidate in self.candidates:
+            chunk = split_text(sample_text, candidate)
+            if not chunk:
+                continue
+            text = max(chunk, key=len)
+            for _ in range(rounds):
+                with self.measure(len(text)):
+                    engine.synthesize(text)
+                if not self._fits(self.buckets[self._bucket(len(text))]):
+                    logger.info(f"Chunk length {candidate} exceeds the memory budget; stopping calibration")
+                    return
+        logger.info(f"Calibrated chunk length for {self.key}: {self.target()}")
+    
+    def _load(self):
+        """Load a previously learned profile for this key."""
+        try:
+            with open(self.profile_path, "r", encoding="utf-8") as f:
+                profiles = json.load(f)
+            profile = profiles.get(self.key) if isinstance(profiles, dict) else None
+            if not isinstance(profile, dict) or profile.get("version") != PROFILE_VERSION:
+                return
+            buckets = profile.get("buckets")
+            for candidate, stats in (buckets.items() if isinstance(buckets, dict) else []):
+                bucket = self._valid_bucket(candidate, stats)
+                if bucket is None:
+                    logger.warning(f"Ignoring malformed chunk profile entry {candidate!r} for {self.key}")
+                    continue
+                self.buckets[bucket] = {
+                    "cps": float(stats["cps"]),
+                    "peak_mb": None if stats.get("peak_mb") is None else float(stats["peak_mb"]),
+                    "samples": stats["samples"],
+                }
+            if self.buckets:
+                logger.info(f"Loaded chunk profile for {self.key}")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load chunk profile: {e}")
+    
+    def _valid_bucket(self, candidate, stats) -> Optional[int]:
+        """Candidate length of a stored bucket, or None if the entry is malformed."""
+        try:
+            bucket = int(candidate)
+        except (TypeError, ValueError):
+            return None
+        if bucket not in self.candidates or not isinstance(stats, dict):
+            return None
+        number = (int, float)
+        cps, samples, peak = stats.get("cps"), stats.get("samples"), stats.get("peak_mb")
+        if isinstance(cps, bool) or not isinstance(cps, number) or cps <= 0:
+            return None
+        if isinstance(samples, bool) or not isinstance(samples, int) or samples < 0:
+            return None
+        if peak is not None and (isinstance(peak, bool) or not isinstance(peak, number)):
+            return None
+        return bucket
+    
+    def save(self):
+        """Persist the learned profile, keeping profiles for other keys."""
+        with self._lock:
+            profile = {
+                "version": PROFILE_VERSION,
+                "target": self._best(),
+                "buckets": {str(candidate): stats for candidate, stats in sorted(self.buckets.items())},
+            }
+        try:
+            profiles = {}
+            if os.path.exists(self.profile_path):
+                with open(self.profile_path, "r", encoding="utf-8") as f:
+                    profiles = json.load(f)
+                if not isinstance(profiles, dict):
+                    profiles = {}
+            profiles[self.key] = profile
+            
+            directory = os.path.dirname(os.path.abspath(self.profile_path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(suffix=".json", dir=directory)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(profiles, f, indent=2)
+            os.replace(tmp_path, self.profile_path)
+            logger.info(f"Saved chunk profile for {self.key} (target {profile['target']})")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not save chunk profile: {e}")
@@ -0,0 +1,145 @@
+"""
+Chapters Module - Per-chapter parallel synthesis with a seek index
+"""
+
+import os
+import re
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import soundfile as sf
+
+from .pdf_reader import Chapter
+
+logger = logging.getLogger(__name__)
+
+
+def chapter_filename(index: int, title: str, extension: str = ".wav") -> str:
+    """Build a filesystem-safe, sortable file name for a chapter."""
+    slug = re.sub(r"[^\w]+", "_", title).strip("_")[:40] or "chapter"
+    return f"{index:02d}_{slug}{extension}"
+
+
+def audio_duration(path: str) -> Optional[float]:
+    """Return the duration of an audio file in seconds, or None if unreadable."""
+    try:
+        return sf.info(path).duration
+    except Exception as e:
+        logger.warning(f"Could not read duration of {path}: {e}")
+        return None
+
+
+class ChapterSynthesizer:
+    """Synthesize chapters into separate audio files in parallel."""
+    
+    def __init__(
+        self,
+        engine_factory: Callable[[], object],
+        max_workers: int = 1,
+        extension: str = ".wav"
+    ):
+        """
+        Initialize Chapter Synthesizer.
+        
+        Args:
+            engine_factory: Callable returning a TTS engine with a ``speak`` method.
+                Each worker thread gets its own engine, since models are not
+                safe to share across threads.
+            max_workers: Number of chapters synthesized at once
+            extension: Audio file extension produced by the engine
+        """
+        self.engine_factory = engine_factory
+        self.max_workers = max(1, max_workers)
+        self.extension = extension
+        self._local = threading.local()
+    
+    def _engine(self):
+        """Get the engine for the current worker thread."""
+        if not hasattr(self._local, "engine"):
+            self._local.engine = self.engine_factory()
+        return self._local.engine
+    
+    def _synthesize(self, index: int, chapter: Chapter, output_dir: str) -> Dict:
+        """Synthesize one chapter and return its index entry."""
+        file_name = chapter_filename(index, chapter.title, self.extension)
+        output_file = os.path.join(output_dir, file_name)
+        entry = {
+            "index": index,
+            "title": chapter.title,
+            "start_page": chapter.start_page,
+            "end_page": chapter.end_page,
+            "file": file_name,
+            "duration": None,
+        }
+        logger.info(f"Synthesizing chapter {index}: {chapter.title} "
+                    f"(pages {chapter.start_page}-{chapter.end_page})")
+        try:
+            self._engine().speak(chapter.text, output_file=output_file)
+            entry["duration"] = audio_duration(output_file)
+        except Exception as e:
+            # Keep going so the other chapters and the index are still written
+            logger.error(f"Chapter {index} ({chapter.title}) failed: {e}")
+            entry["file"] = None
+            entry["error"] = str(e)
+        return entry
+    
+    def synthesize(self, chapters: List[Chapter], output_dir: str, source: str = "") -> List[Dict]:
+        """
+        Synthesize all chapters and write the seek index.
+        
+        Args:
+            chapters: Chapters to synthesize
+            output_dir: Directory for chapter audio and index files
+            source: Source PDF path recorded in the index
+        
+        Returns:
+            Index entries in chapter order; failed chapters have an ``error``
+            and no ``file``
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(self._synthesize, i, chapter, output_dir)
+                for i, chapter in enumerate(chapters, start=1)
+            ]
+            entries = [future.result() for future in futures]
+        
+        write_index(entries, output_dir, source)
+        failed = sum(1 for entry in entries if "error" in entry)
+        if failed:
+            logger.error(f"{failed} of {len(entries)} chapters failed; the index lists them without audio")
+        return entries
+
+
+def write_index(entries: List[Dict], output_dir: str, source: str = ""):
+    """
+    Write ``index.json`` and ``index.m3u`` describing the chapter files.
+    
+    Args:
+        entries: Chapter entries as returned by ``ChapterSynthesizer.synthesize``
+        output_dir: Directory holding the chapter files
+        source: Source PDF path
+    """
+    offset = 0.0
+    for entry in entries:
+        entry["offset"] = offset
+        offset += entry["duration"] or 0.0
+    
+    with open(os.path.join(output_dir, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(
+            {"source": source, "total_duration": offset, "chapters": entries},
+            f, ensure_ascii=False, indent=2
+        )
+    
+    with open(os.path.join(output_dir, "index.m3u"), "w", encoding="utf-8") as f:
+        f.write("#EXTM3U\n")
+        for entry in entries:
+            if entry["file"] is None:
+                continue
+            duration = round(entry["duration"]) if entry["duration"] is not None else -1
+            f.write(f"#EXTINF:{duration},{entry['title']}\n{entry['file']}\n")
+    
+    logger.info(f"Chapter index written to: {output_dir}")
@@ -0,0 +1,203 @@
+"""
+Incremental Module - Re-synthesize only the pages that changed between PDF revisions
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+
+from .pdf_reader import PDFReader
+from .text_chunker import split_text
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 2
+
+
+def file_hash(path: str) -> str:
+    """Hash a file's contents, to tell whether an output is the one a manifest describes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def remove_manifest(output_file: str):
+    """
+    Delete the manifest of an output file, if any.
+    
+    Call this before overwriting an output by other means, so a later
+    incremental run doesn't trust a manifest describing different audio.
+    
+    Args:
+        output_file: Audio file whose manifest should be removed
+    """
+    manifest_file = IncrementalConverter.manifest_path(output_file)
+    if os.path.exists(manifest_file):
+        os.remove(manifest_file)
+        logger.info(f"Removed stale manifest: {manifest_file}")
+
+
+def text_hash(text: str) -> str:
+    """Hash chunk text, ignoring whitespace differences from extraction."""
+    normalized = " ".join(text.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class IncrementalConverter:
+    """Convert a PDF to a single audio file, reusing audio from the previous revision."""
+    
+    def __init__(self, engine, chunk_chars: int = 250):
+        """
+        Initialize Incremental Converter.
+        
+        Args:
+            engine: TTS engine whose ``synthesize`` returns PCM (TTSEngine, VoiceCloneTTS or SileroTTSEngine)
+            chunk_chars: Maximum characters per synthesized chunk
+        
+        Raises:
+            TypeError: If the engine has no PCM ``synthesize`` (e.g. GoogleTTSEngine)
+        """
+        if not callable(getattr(engine, "synthesize", None)):
+            raise TypeError(f"{type(engine).__name__} does not synthesize PCM audio and cannot be used here")
+        self.engine = engine
+        self.chunk_chars = chunk_chars
+    
+    @staticmethod
+    def manifest_path(output_file: str) -> str:
+        """Path of the manifest stored next to an output file."""
+        return f"{output_file}.manifest.json"
+    
+    def _settings(self) -> Dict:
+        """Settings that must match for previous audio to be reusable."""
+        return {
+            "engine": type(self.engine).__name__,
+            "language": getattr(self.engine, "language", None),
+            "voice_sample": getattr(self.engine, "voice_sample", None),
+            "chunk_chars": self.chunk_chars,
+        }
+    
+    def _chunk_pages(self, page_texts: List[str]) -> List[Tuple[int, str]]:
+        """Split each page into (1-based page number, chunk text) pairs."""
+        chunks = []
+        for page_number, page_text in enumerate(page_texts, start=1):
+            for chunk in split_text(page_text, self.chunk_chars):
+                chunks.append((page_number, chunk))
+        return chunks
+    
+    def _load_previous(self, output_file: str) -> Tuple[Optional[Dict], Optional[np.ndarray]]:
+        """Load the previous manifest and audio if they can be reused."""
+        manifest_file = self.manifest_path(output_file)
+        if not (os.path.exists(manifest_file) and os.path.exists(output_file)):
+            return None, None
+        
+        try:
+            with open(manifest_file, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version") != MANIFEST_VERSION or manifest.get("settings") != self._settings():
+                logger.info("Previous conversion used different settings; re-synthesizing everything")
+                return None, None
+            # The output may have been overwritten since the manifest was written
+            if file_hash(output_file) != manifest.get("audio_hash"):
+                logger.warning("Output audio does not match its manifest; re-synthesizing everything")
+                return None, None
+            audio, sample_rate = sf.read(output_file, dtype="float32")
+            if (sample_rate != manifest.get("sample_rate") or len(audio) != manifest.get("frames")
+                    or any(entry["end"] > len(audio) for entry in manifest["chunks"])):
+                logger.warning("Output audio does not match its manifest; re-synthesizing everything")
+                return None, None
+            return manifest, audio
+        except Exception as e:
+            logger.warning(f"Could not load previous conversion, re-synthesizing everything: {e}")
+            return None, None
+    
+    def convert(self, pdf_path: str, output_file: str, method: str = "pdfplumber") -> Dict:
+        """
+        Convert a PDF, re-synthesizing only chunks whose text changed.
+        
+        Args:
+            pdf_path: Path to the (possibly revised) PDF
+            output_file: Output WAV path; its manifest is stored alongside
+            method: PDF extraction method
+        
+        Returns:
+            Statistics with the number of chunks, reused and synthesized
+        """
+        page_texts = PDFReader(pdf_path, method=method).extract_page_texts()
+        chunks = self._chunk_pages(page_texts)
+        if not chunks:
+            raise ValueError("No text extracted from PDF")
+        
+        manifest, previous_audio = self._load_previous(output_file)
+        
+        # Old segments by text hash; a hash can repeat (e.g. running headers)
+        reusable = {}
+        if manifest:
+            for entry in manifest["chunks"]:
+                reusable.setdefault(entry["hash"], []).append(entry)
+        
+        sample_rate = manifest["sample_rate"] if manifest else None
+        segments = []
+        entries = []
+        offset = 0
+        reused = 0
+        for page_number, chunk in chunks:
+            digest = text_hash(chunk)
+            if reusable.get(digest):
+                old = reusable[digest].pop(0)
+                audio = previous_audio[old["start"]:old["end"]]
+                reused += 1
+            else:
+                audio, chunk_rate = self.engine.synthesize(chunk)
+                if sample_rate is None:
+                    sample_rate = chunk_rate
+                elif chunk_rate != sample_rate:
+                    raise ValueError(f"Engine sample rate changed ({chunk_rate} != {sample_rate})")
+            
+            segments.append(audio)
+            entries.append({
+                "page": page_number,
+                "hash": digest,
+                "start": offset,
+                "end": offset + len(audio),
+            })
+            offset += len(audio)
+        
+        # Write both files to temporary paths first so a failed run keeps the
+        # previous audio intact; the audio hash catches a crash between the renames
+        output_dir = os.path.dirname(os.path.abspath(output_file))
+        os.makedirs(output_dir, exist_ok=True)
+        fd, tmp_audio = tempfile.mkstemp(suffix=".wav", dir=output_dir)
+        os.close(fd)
+        fd, tmp_manifest = tempfile.mkstemp(suffix=".json", dir=output_dir)
+        os.close(fd)
+        try:
+            sf.write(tmp_audio, np.concatenate(segments), sample_rate)
+            with open(tmp_manifest, "w", encoding="utf-8") as f:
+                json.dump({
+                    "version": MANIFEST_VERSION,
+                    "source": os.path.basename(pdf_path),
+                    "settings": self._settings(),
+                    "sample_rate": sample_rate,
+                    "frames": offset,
+                    "audio_hash": file_hash(tmp_audio),
+                    "chunks": entries,
+                }, f, indent=2)
+            os.replace(tmp_audio, output_file)
+            os.replace(tmp_manifest, self.manifest_path(output_file))
+        finally:
+            for path in (tmp_audio, tmp_manifest):
+                if os.path.exists(path):
+                    os.remove(path)
+        
+        stats = {"chunks": len(chunks), "reused": reused, "synthesized": len(chunks) - reused}
+        logger.info(f"Incremental conversion saved to: {output_file} "
+                    f"({stats['synthesized']} synthesized, {stats['reused']} reused)")
+        return stats
@@ -4,12 +4,23 @@ PDF Reader Module - Extract text from PDF files
 
 import PyPDF2
 import pdfplumber
-from typing import List, Optional
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class Chapter:
+    """A contiguous range of PDF pages treated as one unit of audio."""
+    
+    title: str
+    start_page: int  # 1-based, inclusive
+    end_page: int  # 1-based, inclusive
+    text: str = ""
+
+
 class PDFReader:
     """Extract text from PDF documents."""
     
@@ -76,3 +87,111 @@ class PDFReader:
         except Exception as e:
             logger.error(f"Error getting page count: {e}")
             return 0
+    
+    def iter_pages(self) -> Iterator[str]:
+        """
+        Extract text lazily, one page at a time.
+        
+        Yields:
+            The (possibly empty) text of each page, in order
+        """
+        if self.method == "pdfplumber":
+            with pdfplumber.open(self.pdf_path) as pdf:
+                for page in pdf.pages:
+                    yield (page.extract_text() or "").strip()
+                    # Drop the parsed layout so memory stays flat on long documents
+                    page.flush_cache()
+        else:
+            with open(self.pdf_path, 'rb') as file:
+                pdf_reader = PyPDF2.PdfReader(file)
+                for page in pdf_reader.pages:
+                    yield (page.extract_text() or "").strip()
+    
+    def extract_page_texts(self) -> List[str]:
+        """
+        Extract text page by page.
+        
+        Returns:
+            List with one (possibly empty) string per page
+        """
+        try:
+            return list(self.iter_pages())
+        except Exception as e:
+            logger.error(f"Error extracting page texts: {e}")
+            return []
+    
+    def get_outline(self) -> List[Tuple[str, int]]:
+        """
+        Get the top-level outline (bookmarks) of the PDF.
+        
+        Returns:
+            List of (title, 1-based start page) sorted by page; empty if the
+            PDF has no outline
+        """
+        try:
+            with open(self.pdf_path, 'rb') as file:
+                pdf_reader = PyPDF2.PdfReader(file)
+                entries = []
+                for item in pdf_reader.outline:
+                    # Nested lists hold sub-sections; only top-level entries are chapters
+                    if isinstance(item, list):
+                        continue
+                    page_number = pdf_reader.get_destination_page_number(item)
+                    if page_number is None or page_number < 0:
+                        continue
+                    entries.append((str(item.title).strip(), page_number + 1))
+                return sorted(entries, key=lambda entry: entry[1])
+        except Exception as e:
+            logger.warning(f"Could not read PDF outline: {e}")
+            return []
+    
+    def get_chapters(self, pages_per_chapter: int = 10) -> List[Chapter]:
+        """
+        Split the PDF into chapters with their text.
+        
+        Uses the PDF outline when there is one, otherwise falls back to
+        fixed ranges of ``pages_per_chapter`` pages.
+        
+        Args:
+            pages_per_chapter: Pages per chapter when there is no outline
+            
+        Returns:
+            List of chapters in reading order
+        """
+        page_texts = self.extract_page_texts()
+        page_count = len(page_texts)
+        if page_count == 0:
+            return []
+        
+        chapters = []
+        outline = []
+        # Bookmarks can point past the pages that were extracted; drop them so
+        # the previous chapter runs to the end of the document
+        for title, start_page in self.get_outline():
+            if start_page > page_count:
+                logger.warning(f"Ignoring bookmark '{title}': it points to page {start_page} of {page_count}")
+                continue
+            outline.append((title, start_page))
+        
+        if outline:
+            # Text before the first bookmark (cover, contents) gets its own chapter
+            if outline[0][1] > 1:
+                outline.insert(0, ("Front Matter", 1))
+            for i, (title, start_page) in enumerate(outline):
+                end_page = outline[i + 1][1] - 1 if i + 1 < len(outline) else page_count
+                if end_page < start_page:
+                    # Several bookmarks on the same page; merge into the next one
+                    continue
+                chapters.append(Chapter(title or f"Chapter {len(chapters) + 1}", start_page, end_page))
+        else:
+            step = max(1, pages_per_chapter)
+            for start_page in range(1, page_count + 1, step):
+                end_page = min(start_page + step - 1, page_count)
+                chapters.append(Chapter(f"Pages {start_page}-{end_page}", start_page, end_page))
+        
+        for chapter in chapters:
+            pages = page_texts[chapter.start_page - 1:chapter.end_page]
+            chapter.text = "\n".join(text for text in pages if text)
+        
+        logger.info(f"Split PDF into {len(chapters)} chapters ({'outline' if outline else 'page ranges'})")
+        return [chapter for chapter in chapters if chapter.text]
@@ -0,0 +1,368 @@
+"""
+Pipeline Module - Overlap PDF extraction, chunking, synthesis and writing
+"""
+
+import os
+import re
+import time
+import queue
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Union, BinaryIO
+
+import soundfile as sf
+
+from .autotune import ChunkTuner
+from .pdf_reader import PDFReader
+from .text_chunker import SENTENCE_END, clean_text, split_text
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's output
+_DONE = object()
+
+# Text ending in one of these finishes a sentence and needs no carry-over
+SENTENCE_TERMINATORS = re.compile(r"[.!?।॥][\"'”’)\]]*$")
+
+
+class PipelineCancelled(Exception):
+    """Raised when a pipeline run is cancelled."""
+
+
+class ExtractionError(ValueError):
+    """Raised when no usable text could be extracted from the PDF."""
+
+
+class StageStats:
+    """Throughput and backpressure statistics for one pipeline stage."""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.max_queue_depth = 0
+        self._depth_total = 0
+        self._depth_samples = 0
+    
+    def record_depth(self, depth: int):
+        """Record the depth of the stage's output queue after a put."""
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+        self._depth_total += depth
+        self._depth_samples += 1
+    
+    @property
+    def mean_queue_depth(self) -> float:
+        """Average depth of the stage's output queue."""
+        return self._depth_total / self._depth_samples if self._depth_samples else 0.0
+    
+    def as_dict(self) -> Dict:
+        """Statistics as a plain dictionary."""
+        return {
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            "max_queue_depth": self.max_queue_depth,
+            "mean_queue_depth": round(self.mean_queue_depth, 2),
+        }
+
+
+class SynthesisPipeline:
+    """
+    Convert a PDF to audio with every stage running concurrently.
+    
+    Stages are connected by bounded queues, so a slow stage applies
+    backpressure instead of letting earlier stages buffer the whole document:
+        
+        extract pages -> clean/chunk -> synthesize -> write
+    
+    The first three stages run in worker threads; writing happens in the
+    calling thread.
+    """
+    
+    def __init__(
+        self,
+        engine,
+        chunk_chars: int = 250,
+        queue_size: int = 8,
+        method: str = "pdfplumber",
+        tuner: Optional[ChunkTuner] = None
+    ):
+        """
+        Initialize Synthesis Pipeline.
+        
+        Args:
+            engine: TTS engine whose ``synthesize`` returns PCM (TTSEngine, VoiceCloneTTS or SileroTTSEngine)
+            chunk_chars: Maximum characters per synthesized chunk
+            queue_size: Capacity of each queue between stages
+            method: PDF extraction method
+            tuner: Chunk tuner that picks the length of each chunk from
+                measured throughput, starting from ``chunk_chars``; its
+                profile is saved after every run
+        
+        Raises:
+            TypeError: If the engine has no PCM ``synthesize`` (e.g. GoogleTTSEngine)
+        """
+        if not callable(getattr(engine, "synthesize", None)):
+            raise TypeError(f"{type(engine).__name__} does not synthesize PCM audio and cannot be used here")
+        self.engine = engine
+        self.chunk_chars = chunk_chars
+        self.tuner = tuner
+        self.queue_size = max(1, queue_size)
+        self.method = method
+        self.pages: List[str] = []
+        self._carry = ""
+        self.stats: Dict[str, StageStats] = {}
+        self._cancel = threading.Event()
+        self._errors: List[BaseException] = []
+    
+    def cancel(self):
+        """Request cancellation; ``run`` stops promptly and raises PipelineCancelled."""
+        self._cancel.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancellation has been requested."""
+        return self._cancel.is_set()
+    
+    def _put(self, q: queue.Queue, item, stats: StageStats):
+        """Put an item on a queue, blocking under backpressure but honouring cancellation."""
+        start = time.perf_counter()
+        while True:
+            if self._cancel.is_set():
+                raise PipelineCancelled()
+            try:
+                q.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        stats.blocked_seconds += time.perf_counter() - start
+        if item is not _DONE:
+            stats.record_depth(q.qsize())
+    
+    def _get(self, q: queue.Queue):
+        """Get an item from a queue, honouring cancellation."""
+        while True:
+            if self._cancel.is_set():
+                raise PipelineCancelled()
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+    
+    def _run_stage(
+        self,
+        stats: StageStats,
+        work: Callable[[object], Iterable],
+        in_q: Optional[queue.Queue],
+        out_q: queue.Queue,
+        finish: Optional[Callable[[], Iterable]] = None
+    ):
+        """
+        Run one stage until its input is exhausted.
+        
+        Args:
+            stats: Statistics for this stage
+            work: Maps one input item to zero or more output items; for the
+                source stage it is called once with None
+            in_q: Input queue, or None for the source stage
+            out_q: Output queue
+            finish: Produces any remaining output items once the input is exhausted
+        """
+        try:
+            while True:
+                if in_q is None:
+                    item = None
+                else:
+                    item = self._get(in_q)
+                    if item is _DONE:
+                        break
+                    stats.items_in += 1
+                
+                self._emit(work(item), out_q, stats)
+                
+                if in_q is None:
+                    break
+            if finish is not None:
+                self._emit(finish(), out_q, stats)
+            self._put(out_q, _DONE, stats)
+        except PipelineCancelled:
+            pass
+        except BaseException as e:
+            logger.error(f"Pipeline stage '{stats.name}' failed: {e}")
+            self._errors.append(e)
+            self._cancel.set()
+    
+    def _emit(self, outputs: Iterable, out_q: queue.Queue, stats: StageStats):
+        """Pass a stage's outputs downstream, timing only the work that produces them."""
+        outputs = iter(outputs)
+        while True:
+            start = time.perf_counter()
+            try:
+                output = next(outputs)
+            except StopIteration:
+                stats.busy_seconds += time.perf_counter() - start
+                break
+            stats.busy_seconds += time.perf_counter() - start
+            self._put(out_q, output, stats)
+            stats.items_out += 1
+    
+    def _extract(self, pdf_path: str):
+        """Source stage: yield (page number, raw text) for each page."""
+        reader = PDFReader(pdf_path, method=self.method)
+        try:
+            for page_number, text in enumerate(reader.iter_pages(), start=1):
+                self.pages.append(text)
+                yield page_number, text
+        except Exception as e:
+            raise ExtractionError(f"Could not extract text from PDF: {e}") from e
+    
+    def _chunk(self, item):
+        """
+        Clean one page and split it into (page number, chunk) pairs.
+        
+        A sentence still open at the end of the page (including a word
+        hyphenated across the break) is held back and joined to the start of
+        the next page, so it is synthesized in one piece.
+        """
+        page_number, text = item
+        if self._carry:
+            text = f"{self._carry}\n{text}" if text else self._carry
+        text = clean_text(text)
+        
+        self._carry = ""
+        if text and not SENTENCE_TERMINATORS.search(text):
+            ends = list(SENTENCE_END.finditer(text))
+            tail = text[ends[-1].end():] if ends else text
+            if len(tail) <= self.chunk_chars:
+                self._carry = tail
+                text = text[:len(text) - len(tail)]
+        
+        for chunk in self._split(text):
+            yield page_number, chunk
+    
+    def _flush_chunk(self):
+        """Emit text held back from the last page."""
+        if self._carry:
+            for chunk in self._split(self._carry):
+                yield len(self.pages), chunk
+            self._carry = ""
+    
+    def _split(self, text: str) -> Iterable[str]:
+        """Split cleaned text into chunks, letting the tuner size each one."""
+        if not self.tuner:
+            yield from split_text(text, self.chunk_chars)
+            return
+        while text:
+            chunk = split_text(text, self.tuner.target(self.chunk_chars))[0]
+            yield chunk
+            # Chunks of single-spaced text are prefixes of it
+            text = text[len(chunk):].lstrip()
+    
+    def _synthesize(self, item):
+        """Synthesize one chunk into (page number, samples, sample rate)."""
+        page_number, chunk = item
+        if self.tuner:
+            with self.tuner.measure(len(chunk)):
+                audio, sample_rate = self.engine.synthesize(chunk)
+        else:
+            audio, sample_rate = self.engine.synthesize(chunk)
+        yield page_number, audio, sample_rate
+    
+    def run(self, pdf_path: str, output: Union[str, BinaryIO]) -> Dict[str, Dict]:
+        """
+        Convert a PDF to a WAV file.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            output: Output WAV path or writable binary file object
+        
+        Returns:
+            Per-stage statistics keyed by stage name
+        """
+        self.pages = []
+        self._carry = ""
+        self._errors = []
+        self._cancel.clear()
+        names = ["extract", "chunk", "synthesize", "write"]
+        self.stats = {name: StageStats(name) for name in names}
+        
+        pages_q = queue.Queue(maxsize=self.queue_size)
+        chunks_q = queue.Queue(maxsize=self.queue_size)
+        audio_q = queue.Queue(maxsize=self.queue_size)
+        
+        threads = [
+            threading.Thread(
+                target=self._run_stage,
+                args=(self.stats["extract"], lambda _: self._extract(pdf_path), None, pages_q),
+                name="pipeline-extract", daemon=True
+            ),
+            threading.Thread(
+                target=self._run_stage,
+                args=(self.stats["chunk"], self._chunk, pages_q, chunks_q, self._flush_chunk),
+                name="pipeline-chunk", daemon=True
+            ),
+            threading.Thread(
+                target=self._run_stage,
+                args=(self.stats["synthesize"], self._synthesize, chunks_q, audio_q),
+                name="pipeline-synthesize", daemon=True
+            ),
+        ]
+        
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        
+        writer = None
+        write_stats = self.stats["write"]
+        try:
+            while True:
+                item = self._get(audio_q)
+                if item is _DONE:
+                    break
+                write_stats.items_in += 1
+                _, audio, sample_rate = item
+                
+                start = time.perf_counter()
+                if writer is None:
+                    channels = 1 if audio.ndim == 1 else audio.shape[1]
+                    writer = sf.SoundFile(output, mode="w", samplerate=sample_rate,
+                                          channels=channels, format="WAV")
+                elif sample_rate != writer.samplerate:
+                    raise ValueError(f"Engine sample rate changed ({sample_rate} != {writer.samplerate})")
+                writer.write(audio)
+                write_stats.busy_seconds += time.perf_counter() - start
+                write_stats.items_out += 1
+        except BaseException as e:
+            self._cancel.set()
+            if not isinstance(e, PipelineCancelled):
+                self._errors.append(e)
+        finally:
+            for thread in threads:
+                thread.join()
+            if writer is not None:
+                writer.close()
+            if self.tuner:
+                self.tuner.save()
+        
+        failed = bool(self._errors) or self._cancel.is_set()
+        if not failed and writer is None:
+            self._errors.append(ExtractionError("No text extracted from PDF"))
+            failed = True
+        if failed and isinstance(output, str) and os.path.exists(output):
+            # Don't leave a truncated file behind
+            os.remove(output)
+        if self._errors:
+            raise self._errors[0]
+        if self._cancel.is_set():
+            raise PipelineCancelled("Pipeline run was cancelled")
+        
+        elapsed = time.perf_counter() - started
+        summary = {name: stats.as_dict() for name, stats in self.stats.items()}
+        logger.info(f"Pipeline finished in {elapsed:.1f}s: " + ", ".join(
+            f"{name} busy {stats['busy_seconds']:.1f}s (max queue {stats['max_queue_depth']})"
+            for name, stats in summary.items()
+        ))
+        return summary
@@ -0,0 +1,262 @@
+"""
+Shared Weights Module - Memory-mapped model weights shared across worker processes
+"""
+
+import os
+import gc
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+import torch
+
+# File locks are POSIX-only; elsewhere only threads of one process are serialized
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of the shared weights file changes
+SHARED_FORMAT_VERSION = 2
+
+
+def _named_tensors(module: torch.nn.Module) -> Iterator[Tuple[str, torch.Tensor, bool]]:
+    """
+    Yield (name, tensor, is_parameter) for every parameter and buffer.
+    
+    Unlike ``state_dict`` this includes non-persistent buffers, which a
+    skeleton built on the meta device needs as well, and tied tensors under
+    each of their names.
+    """
+    for name, parameter in module.named_parameters(remove_duplicate=False):
+        yield name, parameter, True
+    for name, buffer in module.named_buffers(remove_duplicate=False):
+        yield name, buffer, False
+
+
+# In-process locks per shared weights file, alongside the file lock
+_export_locks: Dict[str, threading.Lock] = {}
+_export_locks_guard = threading.Lock()
+
+
+@contextmanager
+def export_lock(path: str):
+    """
+    Hold an exclusive lock on a shared weights file while it is created.
+    
+    One worker loads the checkpoint and exports it while the others wait,
+    then map the finished file, instead of each loading and exporting its
+    own copy. The lock is a ``.lock`` file next to ``path``, so it holds
+    across processes as well as threads.
+    
+    Args:
+        path: Shared weights file
+    """
+    path = os.path.abspath(path)
+    with _export_locks_guard:
+        thread_lock = _export_locks.setdefault(path, threading.Lock())
+    with thread_lock:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def read_model_name(path: str) -> Optional[str]:
+    """
+    Name of the model a shared weights file was exported from.
+    
+    Args:
+        path: Shared weights file
+    
+    Returns:
+        The model name, or None if the file is missing or in an older format
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        shared = torch.load(path, mmap=True, weights_only=True, map_location="cpu")
+    except Exception as e:
+        logger.warning(f"Could not read shared weights file {path}: {e}")
+        return None
+    if not isinstance(shared, dict) or shared.get("version") != SHARED_FORMAT_VERSION:
+        return None
+    return shared.get("model_name")
+
+
+def export_weights(module: torch.nn.Module, path: str, model_name: str):
+    """
+    Save a module's weights in a memory-mappable format.
+    
+    The file is written atomically, so a reader never sees a partial file;
+    hold ``export_lock`` so only one worker exports.
+    
+    Args:
+        module: Model whose weights are saved
+        path: Destination file
+        model_name: Name of the model, recorded so a file from another model is never loaded
+    """
+    tensors = {name: tensor.detach().cpu() for name, tensor, _ in _named_tensors(module)}
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(suffix=".pt", dir=directory)
+    os.close(fd)
+    try:
+        # The default zipfile format stores each tensor so torch.load(mmap=True) can map it
+        torch.save({"version": SHARED_FORMAT_VERSION, "model_name": model_name, "tensors": tensors}, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    logger.info(f"Exported {len(tensors)} weight tensors of {model_name} to: {path}")
+
+
+def load_weights_mmap(module: torch.nn.Module, path: str, model_name: str):
+    """
+    Replace a module's weights with read-only memory-mapped tensors.
+    
+    Every process mapping the same file shares its pages through the OS page
+    cache, so the weights are resident once per node rather than once per
+    worker. The module may be a skeleton built on the meta device.
+    
+    Args:
+        module: Model to load into; must be on the CPU or the meta device
+        path: File written by ``export_weights``
+        model_name: Expected model name
+    
+    Raises:
+        ValueError: If the file belongs to another model or does not match the module
+    """
+    shared = torch.load(path, mmap=True, weights_only=True, map_location="cpu")
+    if not isinstance(shared, dict) or shared.get("version") != SHARED_FORMAT_VERSION:
+        raise ValueError(f"{path} is not a shared weights file in the current format")
+    if shared.get("model_name") != model_name:
+        raise ValueError(f"{path} holds weights for {shared.get('model_name')}, not {model_name}")
+    
+    tensors: Dict[str, torch.Tensor] = shared["tensors"]
+    targets = list(_named_tensors(module))
+    missing = [name for name, _, _ in targets if name not in tensors]
+    if missing:
+        raise ValueError(f"{path} does not match the model ({len(missing)} tensors missing, e.g. {missing[0]})")
+    
+    # Assign the mapped tensors directly instead of copying into the existing ones
+    for name, current, is_parameter in targets:
+        owner_name, _, attribute = name.rpartition(".")
+        owner = module.get_submodule(owner_name)
+        tensor = tensors[name]
+        if tensor.shape != current.shape:
+            raise ValueError(f"{path} does not match the model (shape of {name})")
+        if is_parameter:
+            owner._parameters[attribute] = torch.nn.Parameter(tensor, requires_grad=False)
+        else:
+            owner._buffers[attribute] = tensor
+    module.eval()
+    # Release any privately allocated copy that was just replaced
+    gc.collect()
+    logger.info(f"Memory-mapped model weights from: {path}")
+
+
+def share_weights(module: torch.nn.Module, path: str, model_name: str):
+    """
+    Back a loaded CPU model with shared weights, (re-)exporting them when the
+    file is missing or was produced by a different model.
+    
+    Args:
+        module: Model to share
+        path: Shared weights file
+        model_name: Name of the model
+    """
+    if read_model_name(path) != model_name:
+        export_weights(module, path, model_name)
+    try:
+        load_weights_mmap(module, path, model_name)
+    except ValueError as e:
+        # A stale file from an older export of the same model; replace it
+        logger.warning(f"Re-exporting shared weights: {e}")
+        export_weights(module, path, model_name)
+        load_weights_mmap(module, path, model_name)
+
+
+class SharedXtts:
+    """
+    XTTS model backed by shared weights, built without loading its checkpoint.
+    
+    Wraps the model in a regular ``TTS.utils.synthesizer.Synthesizer``, so
+    ``tts`` splits sentences and pads between them exactly as ``TTS.api.TTS``
+    does and a worker can use it in place of a fully loaded model.
+    """
+    
+    def __init__(self, model_name: str, path: str):
+        """
+        Build the model skeleton and map the shared weights into it.
+        
+        Args:
+            model_name: Coqui model name, e.g. 'tts_models/multilingual/multi-dataset/xtts_v2'
+            path: Shared weights file exported from the same model
+        
+        Raises:
+            ValueError: If the file does not match the model
+        """
+        from TTS.utils.manage import ModelManager
+        from TTS.utils.synthesizer import Synthesizer
+        from TTS.tts.configs.xtts_config import XttsConfig
+        from TTS.tts.layers.xtts.tokenizer import VoiceBpeTokenizer
+        from TTS.tts.models.xtts import Xtts
+        from TTS.tts.utils.languages import LanguageManager
+        from TTS.tts.utils.speakers import SpeakerManager
+        
+        # Only config, vocabulary and speaker files are read; the checkpoint is not
+        model_dir, _, _ = ModelManager().download_model(model_name)
+        config = XttsConfig()
+        config.load_json(os.path.join(model_dir, "config.json"))
+        
+        # Same structural setup as Xtts.load_checkpoint, minus the weights,
+        # with every tensor allocated on the meta device (no memory)
+        with torch.device("meta"):
+            model = Xtts.init_from_config(config)
+            model.tokenizer = VoiceBpeTokenizer(vocab_file=os.path.join(model_dir, "vocab.json"))
+            model.init_models()
+        model.language_manager = LanguageManager(config)
+        speaker_file = os.path.join(model_dir, "speakers_xtts.pth")
+        model.speaker_manager = SpeakerManager(speaker_file) if os.path.exists(speaker_file) else None
+        
+        load_weights_mmap(model, path, model_name)
+        model.gpt.init_gpt_for_inference(kv_cache=model.args.kv_cache, use_deepspeed=False)
+        model.eval()
+        
+        # A Synthesizer given no paths loads nothing; hand it the model the
+        # way Synthesizer._load_tts_from_dir would
+        synthesizer = Synthesizer(use_cuda=False)
+        synthesizer.tts_config = config
+        synthesizer.tts_model = model
+        synthesizer.output_sample_rate = config.audio["output_sample_rate"]
+        
+        self.model_name = model_name
+        self.synthesizer = synthesizer
+    
+    def tts(self, text: str, language: Optional[str] = None, speaker_wav: Optional[str] = None,
+            split_sentences: bool = True, **kwargs):
+        """Synthesize text like ``TTS.api.TTS.tts``, returning the waveform samples."""
+        return self.synthesizer.tts(
+            text=text,
+            speaker_name=None,
+            language_name=language,
+            speaker_wav=speaker_wav,
+            reference_wav=None,
+            style_wav=None,
+            style_text=None,
+            reference_speaker_name=None,
+            split_sentences=split_sentences,
+            **kwargs,
+        )
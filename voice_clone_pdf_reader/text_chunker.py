@@ -0,0 +1,84 @@
+"""
+Text Chunker Module - Split long text into synthesis-sized chunks
+"""
+
+import re
+from typing import List
+
+# Sentence terminators, including the Devanagari danda used by most Indic scripts
+SENTENCE_END = re.compile(r"(?<=[.!?।॥])\s+")
+
+# Weaker break points used when a single sentence is still too long
+CLAUSE_END = re.compile(r"(?<=[,;:،])\s+")
+
+
+def clean_text(text: str) -> str:
+    """
+    Tidy text extracted from a PDF for synthesis.
+    
+    Re-joins words hyphenated across line breaks and collapses whitespace.
+    
+    Args:
+        text: Raw extracted text
+        
+    Returns:
+        Cleaned text
+    """
+    text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)
+    return " ".join(text.split())
+
+
+def split_text(text: str, max_chars: int = 100) -> List[str]:
+    """
+    Split text into chunks of at most ``max_chars`` characters.
+    
+    Chunks break on sentence boundaries where possible, then on clause
+    boundaries, then on whitespace, and only cut inside a word as a last resort.
+    
+    Args:
+        text: Input text
+        max_chars: Maximum length of a single chunk
+    
+    Returns:
+        List of non-empty text chunks, in reading order
+    """
+    if max_chars <= 0:
+        raise ValueError("max_chars must be positive")
+    
+    text = " ".join(text.split())
+    if not text:
+        return []
+    
+    chunks = []
+    current = ""
+    for piece in _pieces(text, max_chars):
+        if not current:
+            current = piece
+        elif len(current) + 1 + len(piece) <= max_chars:
+            current = f"{current} {piece}"
+        else:
+            chunks.append(current)
+            current = piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _pieces(text: str, max_chars: int) -> List[str]:
+    """Break text into pieces that each fit within ``max_chars``."""
+    pieces = []
+    for sentence in SENTENCE_END.split(text):
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+        for clause in CLAUSE_END.split(sentence):
+            if len(clause) <= max_chars:
+                pieces.append(clause)
+                continue
+            for word in clause.split(" "):
+                while len(word) > max_chars:
+                    pieces.append(word[:max_chars])
+                    word = word[max_chars:]
+                if word:
+                    pieces.append(word)
+    return pieces
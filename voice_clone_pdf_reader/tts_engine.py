@@ -2,20 +2,26 @@
 TTS Engine Module - Text-to-Speech conversion with Indian language support
 """
 
+import io
 import os
+import re
+import json
+import base64
 import logging
-from typing import Optional, Union
+import threading
+import urllib.parse
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing import Optional, Tuple, Union
 import tempfile
+import numpy as np
+import requests
+import requests.adapters
+import soundfile as sf
 import torch
 from TTS.api import TTS
 
-# Try to import gTTS for better quality Indian language support
-try:
-    from gtts import gTTS
-    GTTS_AVAILABLE = True
-except ImportError:
-    GTTS_AVAILABLE = False
-    logging.warning("gTTS not available. Install with: pip install gtts")
+from .shared_weights import SharedXtts, export_lock, read_model_name, share_weights
+from .text_chunker import split_text
 
 # Try to import Silero TTS for better quality
 try:
@@ -44,19 +50,56 @@ LANGUAGE_CODES = {
 }
 
 
+def encode_wav(audio: np.ndarray, sample_rate: int) -> bytes:
+    """
+    Encode PCM samples as an in-memory WAV file.
+    
+    Args:
+        audio: PCM samples
+        sample_rate: Sample rate in Hz
+        
+    Returns:
+        WAV file contents
+    """
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, sample_rate, format="WAV")
+    return buffer.getvalue()
+
+
+def _temp_output_file(suffix: str) -> str:
+    """Create a temporary output path for callers of ``speak`` that give none."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
+        return tmp_file.name
+
+
+# XTTS checkpoints in order of preference
+XTTS_MODEL_NAMES = [
+    "tts_models/multilingual/multi-dataset/xtts",
+    "tts_models/multilingual/multi-dataset/xtts_v2",
+]
+
+
 class TTSEngine:
     """Basic Text-to-Speech Engine."""
     
-    def __init__(self, language: str = "hindi", device: Optional[str] = None):
+    def __init__(
+        self,
+        language: str = "hindi",
+        device: Optional[str] = None,
+        shared_weights: Optional[str] = None
+    ):
         """
         Initialize TTS Engine.
         
         Args:
             language: Target language
             device: Device to use ('cpu' or 'cuda')
+            shared_weights: Path of a memory-mapped weights file shared by all
+                workers on the node; created on first use (CPU only)
         """
         self.language = language.lower()
         self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.shared_weights = shared_weights
         self.model = None
         self._load_model()
     
@@ -65,53 +108,111 @@ class TTSEngine:
         try:
             logger.info(f"Loading TTS model for language: {self.language}")
             
-            # Try XTTS v1.5 first (better quality than v2 for some use cases)
-            try:
-                model_name = "tts_models/multilingual/multi-dataset/xtts"
-                logger.info(f"Attempting to load: {model_name}")
-                self.model = TTS(
-                    model_name=model_name,
-                    progress_bar=True,
-                    gpu=self.device == "cuda"
-                )
-            except Exception as e:
-                logger.warning(f"XTTS v1.5 failed, falling back to XTTS v2: {e}")
-                # Fallback to XTTS v2
-                self.model = TTS(
-                    model_name="tts_models/multilingual/multi-dataset/xtts_v2",
-                    progress_bar=True,
-                    gpu=self.device == "cuda"
-                )
+            if self.shared_weights and self.device != "cpu":
+                logger.warning("Shared weights only apply on CPU; loading a private copy")
+                self.shared_weights = None
+            
+            if not self.shared_weights:
+                self._load_checkpoint()
+            elif not self._load_shared():
+                # Only one worker converts the checkpoint; the others wait here
+                # and then build on the file it exported
+                with export_lock(self.shared_weights):
+                    if not self._load_shared():
+                        model_name = self._load_checkpoint()
+                        share_weights(self.model.synthesizer.tts_model, self.shared_weights, model_name)
             
             logger.info(f"TTS model loaded successfully on {self.device}")
         except Exception as e:
             logger.error(f"Error loading TTS model: {e}")
             raise
     
-    def speak(self, text: str, output_file: Optional[str] = None) -> str:
+    def _load_shared(self) -> bool:
         """
-        Convert text to speech and save to file.
+        Build the model around existing shared weights without loading the checkpoint.
+        
+        Returns:
+            Whether the model was built; False if there is no usable shared weights file
+        """
+        model_name = read_model_name(self.shared_weights)
+        if model_name not in XTTS_MODEL_NAMES:
+            return False
+        try:
+            self.model = SharedXtts(model_name, self.shared_weights)
+            logger.info(f"TTS model built on shared weights: {model_name}")
+            return True
+        except Exception as e:
+            logger.warning(f"Could not use shared weights, loading the checkpoint: {e}")
+            return False
+    
+    def _load_checkpoint(self) -> str:
+        """
+        Load a private copy of the XTTS checkpoint.
+        
+        Returns:
+            Name of the loaded model
+        """
+        # Try XTTS v1.5 first (better quality than v2 for some use cases)
+        try:
+            model_name = XTTS_MODEL_NAMES[0]
+            logger.info(f"Attempting to load: {model_name}")
+            self.model = TTS(
+                model_name=model_name,
+                progress_bar=True,
+                gpu=self.device == "cuda"
+            )
+        except Exception as e:
+            logger.warning(f"XTTS v1.5 failed, falling back to XTTS v2: {e}")
+            # Fallback to XTTS v2
+            model_name = XTTS_MODEL_NAMES[1]
+            self.model = TTS(
+                model_name=model_name,
+                progress_bar=True,
+                gpu=self.device == "cuda"
+            )
+        return model_name
+    
+    @property
+    def sample_rate(self) -> int:
+        """Output sample rate of the loaded model."""
+        return self.model.synthesizer.output_sample_rate
+    
+    def synthesize(self, text: str) -> Tuple[np.ndarray, int]:
+        """
+        Convert text to speech in memory.
         
         Args:
             text: Input text
-            output_file: Output file path (optional)
             
         Returns:
-            Path to output audio file
+            Tuple of (float32 PCM samples, sample rate)
         """
         if not self.model:
             raise ValueError("Model not loaded")
         
-        if output_file is None:
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-                output_file = tmp_file.name
-        
         # Use basic parameters that work with all models
-        self.model.tts_to_file(
+        wav = self.model.tts(
             text=text,
-            file_path=output_file,
             language=LANGUAGE_CODES.get(self.language, "hi")
         )
+        return np.asarray(wav, dtype=np.float32), self.sample_rate
+    
+    def speak(self, text: str, output_file: Optional[str] = None) -> str:
+        """
+        Convert text to speech and save to file.
+        
+        Args:
+            text: Input text
+            output_file: Output file path (optional)
+            
+        Returns:
+            Path to output audio file
+        """
+        audio, sample_rate = self.synthesize(text)
+        
+        if output_file is None:
+            output_file = _temp_output_file('.wav')
+        sf.write(output_file, audio, sample_rate)
         
         logger.info(f"Audio saved to: {output_file}")
         return output_file
@@ -120,14 +221,43 @@ class TTSEngine:
 class GoogleTTSEngine:
     """Google TTS Engine - Better quality for Indian languages."""
     
-    def __init__(self, language: str = "hindi"):
+    # Google Translate TTS endpoint and RPC id (the same protocol gTTS uses)
+    GOOGLE_TTS_URL = "https://translate.google.{tld}/_/TranslateWebserverUi/data/batchexecute"
+    GOOGLE_TTS_RPC = "jQ1olc"
+    
+    # Google rejects requests longer than this many characters
+    MAX_CHUNK_CHARS = 100
+    
+    def __init__(
+        self,
+        language: str = "hindi",
+        max_workers: int = 8,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 10.0,
+        tld: str = "com",
+        base_url: Optional[str] = None
+    ):
         """
         Initialize Google TTS Engine.
         
         Args:
             language: Target language
+            max_workers: Maximum number of chunk requests in flight at once
+            max_retries: Retries per chunk after the first attempt fails
+            backoff: Base delay in seconds for exponential retry backoff
+            timeout: Per-request timeout in seconds
+            tld: Google top-level domain to use
+            base_url: Override the endpoint URL (e.g. a local stand-in server)
         """
         self.language = language.lower()
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max(0, max_retries)
+        self.backoff = backoff
+        self.timeout = timeout
+        self.url = base_url or self.GOOGLE_TTS_URL.format(tld=tld)
+        self._session = None
+        self._session_lock = threading.Lock()
         
         # Map to Google TTS language codes
         self.GTTS_LANGUAGE_CODES = {
@@ -145,6 +275,127 @@ class GoogleTTSEngine:
             "english": "en",
         }
     
+    @property
+    def session(self) -> requests.Session:
+        """Pooled HTTP session shared by all chunk requests."""
+        # Worker threads race to the first request; the lock ensures a single session
+        with self._session_lock:
+            if self._session is None:
+                self._create_session()
+        return self._session
+    
+    def _create_session(self):
+        """Create the pooled HTTP session."""
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.max_workers
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({
+            "Referer": "http://translate.google.com/",
+            "User-Agent": "Mozilla/5.0",
+            "Content-Type": "application/x-www-form-urlencoded;charset=utf-8",
+        })
+        self._session = session
+    
+    def close(self):
+        """Close the pooled HTTP session."""
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+    
+    def _package_rpc(self, text: str, lang_code: str) -> str:
+        """Build the form-encoded request body for one chunk."""
+        parameter = json.dumps([text, lang_code, None, "null"], separators=(",", ":"))
+        rpc = json.dumps([[[self.GOOGLE_TTS_RPC, parameter, None, "generic"]]], separators=(",", ":"))
+        return f"f.req={urllib.parse.quote(rpc)}&"
+    
+    def _fetch_chunk(self, text: str, lang_code: str, cancel: Optional[threading.Event] = None) -> bytes:
+        """
+        Fetch the MP3 audio for a single chunk, retrying with backoff.
+        
+        Args:
+            text: Chunk text (at most MAX_CHUNK_CHARS characters)
+            lang_code: Google language code
+            cancel: Set when another chunk has failed; stops further retries
+            
+        Returns:
+            MP3 bytes for the chunk
+        """
+        cancel = cancel or threading.Event()
+        body = self._package_rpc(text, lang_code)
+        audio_pattern = re.compile(re.escape(self.GOOGLE_TTS_RPC) + r'","\[\\"(.*)\\"]')
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(self.url, data=body, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            else:
+                status = response.status_code
+                if status == 429 or status >= 500:
+                    error = requests.HTTPError(f"HTTP {status}", response=response)
+                else:
+                    # Other client errors are permanent, so they are not retried
+                    response.raise_for_status()
+                    audio = b""
+                    for line in response.text.splitlines():
+                        match = audio_pattern.search(line)
+                        if match:
+                            audio += base64.b64decode(match.group(1).encode("ascii"))
+                    if audio:
+                        return audio
+                    error = ValueError("No audio in Google TTS response")
+            
+            if attempt == self.max_retries:
+                logger.error(f"Google TTS chunk failed after {attempt + 1} attempts: {error}")
+                raise error
+            delay = self.backoff * (2 ** attempt)
+            logger.warning(f"Google TTS chunk failed ({error}), retrying in {delay:.1f}s")
+            if cancel.wait(delay):
+                raise error
+    
+    def synthesize_mp3(self, text: str) -> bytes:
+        """
+        Convert text to speech in memory using Google TTS.
+        
+        Google returns encoded MP3 rather than PCM, so unlike the other
+        engines this engine has no ``synthesize``. The text is split into chunks that are fetched concurrently over a
+        pooled session and joined in their original order.
+        
+        Args:
+            text: Input text
+            
+        Returns:
+            Encoded MP3 audio
+        """
+        lang_code = self.GTTS_LANGUAGE_CODES.get(self.language, "hi")
+        chunks = split_text(text, self.MAX_CHUNK_CHARS)
+        if not chunks:
+            raise ValueError("No text to synthesize")
+        
+        # The pool keeps at most max_workers requests in flight; segments are
+        # joined in submission order, so they stay ordered
+        cancel = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            futures = [executor.submit(self._fetch_chunk, chunk, lang_code, cancel) for chunk in chunks]
+            done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in futures:
+                if future in done and future.exception() is not None:
+                    raise future.exception()
+            audio = b"".join(future.result() for future in futures)
+        finally:
+            # On failure, drop queued chunks and stop in-flight retries
+            # instead of waiting for every remaining chunk
+            cancel.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        logger.info(f"Google TTS synthesized {len(chunks)} chunks")
+        return audio
+    
     def speak(self, text: str, output_file: Optional[str] = None) -> str:
         """
         Convert text to speech using Google TTS.
@@ -156,17 +407,12 @@ class GoogleTTSEngine:
         Returns:
             Path to output audio file
         """
-        if not GTTS_AVAILABLE:
-            raise ImportError("gTTS is not installed. Please install it with: pip install gtts")
+        audio = self.synthesize_mp3(text)
         
         if output_file is None:
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as tmp_file:
-                output_file = tmp_file.name
-        
-        lang_code = self.GTTS_LANGUAGE_CODES.get(self.language, "hi")
-        
-        tts = gTTS(text=text, lang=lang_code, slow=False)
-        tts.save(output_file)
+            output_file = _temp_output_file('.mp3')
+        with open(output_file, "wb") as f:
+            f.write(audio)
         
         logger.info(f"Google TTS audio saved to: {output_file}")
         return output_file
@@ -206,6 +452,7 @@ class SileroTTSEngine:
         }
         
         self.lang_code = self.SILERO_LANGUAGE_CODES.get(self.language, "hi")
+        self.sample_rate = 8000
         self.device = torch.device("cpu")
         
         # Initialize Silero TTS
@@ -215,30 +462,39 @@ class SileroTTSEngine:
             language=self.lang_code
         )
     
-    def speak(self, text: str, output_file: Optional[str] = None) -> str:
+    def synthesize(self, text: str) -> Tuple[np.ndarray, int]:
         """
-        Convert text to speech using Silero TTS.
+        Convert text to speech in memory using Silero TTS.
         
         Args:
             text: Input text
-            output_file: Output file path (optional)
             
         Returns:
-            Path to output audio file
+            Tuple of (float32 PCM samples, sample rate)
         """
-        if output_file is None:
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-                output_file = tmp_file.name
-        
-        # Generate audio
         audio = self.model.apply_tts(
             text=text,
             speaker=self.lang_code,
-            sample_rate=8000
+            sample_rate=self.sample_rate
         )
+        return audio.cpu().numpy().astype(np.float32), self.sample_rate
+    
+    def speak(self, text: str, output_file: Optional[str] = None) -> str:
+        """
+        Convert text to speech using Silero TTS.
         
-        # Save to file
-        self.model.save_wav(audio, output_file)
+        Args:
+            text: Input text
+            output_file: Output file path (optional)
+            
+        Returns:
+            Path to output audio file
+        """
+        audio, sample_rate = self.synthesize(text)
+        
+        if output_file is None:
+            output_file = _temp_output_file('.wav')
+        sf.write(output_file, audio, sample_rate)
         
         logger.info(f"Silero TTS audio saved to: {output_file}")
         return output_file
@@ -251,7 +507,8 @@ class VoiceCloneTTS(TTSEngine):
         self,
         language: str = "hindi",
         voice_sample: Optional[str] = None,
-        device: Optional[str] = None
+        device: Optional[str] = None,
+        shared_weights: Optional[str] = None
     ):
         """
         Initialize Voice Cloning TTS Engine.
@@ -260,21 +517,21 @@ class VoiceCloneTTS(TTSEngine):
             language: Target language
             voice_sample: Path to reference voice sample for cloning
             device: Device to use
+            shared_weights: Path of a shared memory-mapped weights file
         """
         self.voice_sample = voice_sample
-        super().__init__(language, device)
+        super().__init__(language, device, shared_weights)
     
-    def clone_voice(self, text: str, reference_voice: Optional[str] = None, output_file: Optional[str] = None) -> str:
+    def synthesize(self, text: str, reference_voice: Optional[str] = None) -> Tuple[np.ndarray, int]:
         """
-        Generate speech with voice cloning.
+        Generate speech with voice cloning in memory.
         
         Args:
             text: Input text
             reference_voice: Path to reference voice sample
-            output_file: Output file path
             
         Returns:
-            Path to output audio file
+            Tuple of (float32 PCM samples, sample rate)
         """
         if not self.model:
             raise ValueError("Model not loaded")
@@ -283,25 +540,39 @@ class VoiceCloneTTS(TTSEngine):
         if not reference:
             raise ValueError("Reference voice sample is required for voice cloning")
         
-        if output_file is None:
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-                output_file = tmp_file.name
-        
         try:
             # Use XTTS v2 for voice cloning
-            self.model.tts_to_file(
+            wav = self.model.tts(
                 text=text,
-                file_path=output_file,
                 speaker_wav=reference,
                 language=LANGUAGE_CODES.get(self.language, "hi")
             )
-            
-            logger.info(f"Voice cloned speech saved to: {output_file}")
-            return output_file
+            return np.asarray(wav, dtype=np.float32), self.sample_rate
         except Exception as e:
             logger.error(f"Error in voice cloning: {e}")
             raise
     
+    def clone_voice(self, text: str, reference_voice: Optional[str] = None, output_file: Optional[str] = None) -> str:
+        """
+        Generate speech with voice cloning.
+        
+        Args:
+            text: Input text
+            reference_voice: Path to reference voice sample
+            output_file: Output file path
+            
+        Returns:
+            Path to output audio file
+        """
+        audio, sample_rate = self.synthesize(text, reference_voice=reference_voice)
+        
+        if output_file is None:
+            output_file = _temp_output_file('.wav')
+        sf.write(output_file, audio, sample_rate)
+        
+        logger.info(f"Voice cloned speech saved to: {output_file}")
+        return output_file
+    
     def speak(self, text: str, output_file: Optional[str] = None) -> str:
         """Convert text to speech with voice cloning."""
         return self.clone_voice(text, output_file=output_file)